@@ -4,6 +4,7 @@ from typing import List
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
+from aqt.utils import showWarning
 
 from .Forvo import Pronunciation
 from .Util import CustomScrollbar
@@ -108,5 +109,19 @@ class AddSingle(QDialog):
     def select_pronunciation(self, pronunciation: Pronunciation):
         self.selected_pronunciation = pronunciation
         if pronunciation.audio is None:
-            pronunciation.download_pronunciation()
-        self.close()
+            def on_downloaded(future):
+                try:
+                    future.result()  # re-raises anything download_pronunciation raised
+                except Exception:
+                    """Keep the dialog open so the user can pick another pronunciation,
+                    and clear the selection so closing it doesn't add a broken sound tag"""
+                    self.selected_pronunciation = None
+                    showWarning("Failed to download the pronunciation from Forvo. Please try again.")
+                    return
+                self.close()
+
+            """Fetch the mp3 in the background so the dialog doesn't freeze; only close
+            (which notifies the editor) once the audio file is actually in place"""
+            pronunciation.mw.taskman.run_in_background(pronunciation.download_pronunciation, on_downloaded)
+        else:
+            self.close()
@@ -1,11 +1,20 @@
+import json
 import os
+import threading
+import time
 import traceback
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List
 
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QWaitCondition, QMutex, pyqtSlot
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QProgressBar, QHBoxLayout, QScrollArea, QWidget, \
-    QCheckBox
+import requests
+from requests.adapters import HTTPAdapter
+
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QProgressBar, QHBoxLayout, QScrollArea, \
+    QPlainTextEdit, QCheckBox
 from anki.cards import Card
 from aqt import AnkiQt
 from aqt.utils import showInfo, askUser
@@ -19,12 +28,73 @@ from .LanguageSelector import LanguageSelector
 from .Util import FailedDownload
 
 import hashlib
-def md5(fname):
-    hash_md5 = hashlib.md5()
-    with open(fname, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+
+
+def _md5_hasher():
+    """The hash is only a download sentinel; usedforsecurity=False skips the
+    OpenSSL 3 legacy-provider indirection and works on FIPS-enabled builds."""
+    return hashlib.new("md5", usedforsecurity=False)
+
+
+"""One keep-alive session for all Jisho and JapanesePod101 requests, so only the
+first lookup per host pays for the TCP + TLS handshake."""
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "anki-forvo-dl"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+
+"""JapanesePod101 serves a fixed "audio not available" clip instead of a 404 when
+a word has no recording. Comparing the file size first lets real audio (the common
+case) skip the MD5 entirely."""
+SENTINEL_MD5 = "7e2c2f954ef6051373ba916f000168dc"
+SENTINEL_SIZE = 52288  # byte length of the sentinel mp3
+
+JAPANESE_POD_URL = "http://assets.languagepod101.com/dictionary/japanese/audiomp3.php"
+JISHO_SEARCH_URL = "https://jisho.org/api/v1/search/words?keyword="
+
+
+"""Per-run caches for the Japanese lookups: repeated queries skip the Jisho and
+JapanesePod101 round-trips entirely. The Jisho part (query -> kana reading) is
+persisted between bulk adds; the mp3 bytes are only kept in memory and dropped
+at the end of the run (cross-run reuse goes through the on-disk dl_cache)."""
+_jp_cache_lock = threading.Lock()
+_JISHO_CACHE: dict = {}  # md5(query) -> kana reading
+_JP101_CACHE: dict = {}  # (query, kana) -> mp3 bytes, or None if JapanesePod101 had no audio
+JP_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds after which the persisted cache is considered stale
+
+
+def _jp_cache_path() -> str:
+    """Lives in user_files like dl_cache.json; temp_dir is wiped by Forvo.cleanup()
+    on every single add, which would throw the cache away between bulk adds."""
+    from . import user_files_dir
+    return os.path.join(user_files_dir, "jp_cache.json")
+
+
+def load_jp_cache():
+    """Loads the persisted query -> kana cache, unless the file is stale (mtime-based invalidation)."""
+    path = _jp_cache_path()
+    try:
+        if not os.path.isfile(path) or time.time() - os.path.getmtime(path) > JP_CACHE_MAX_AGE:
+            return
+        with open(path, "r", encoding="utf8") as f:
+            entries = json.load(f)
+        with _jp_cache_lock:
+            _JISHO_CACHE.update(entries)
+    except Exception:
+        pass  # a broken cache file just means we look everything up again
+
+
+def save_jp_cache():
+    """Writes the query -> kana cache back to disk for the next bulk add."""
+    try:
+        with _jp_cache_lock:
+            entries = dict(_JISHO_CACHE)
+        with open(_jp_cache_path(), "w", encoding="utf8") as f:
+            f.write(json.dumps(entries))
+    except Exception:
+        pass
+
 
 class BulkAdd(QDialog):
     """Dialog that opens when clicking on 'Bulk Add Forvo Audio to X cards' in the context menu in the browser"""
@@ -32,6 +102,13 @@ class BulkAdd(QDialog):
         super().__init__(parent)
         self.config: Config = config
         self.unique_cards = unique_cards
+        """card.note_type() is a collection lookup, so resolve every card's note type id
+        and deck id once instead of once per ensure_* pass"""
+        self._card_ntids = list({card.note_type()["id"] for card in unique_cards})
+        self._card_dids = list({card.did for card in unique_cards})
+        self.n = len(unique_cards)  # card count, reused everywhere below
+        self.n2 = self.n * 2  # resulting request count towards Forvo
+        self._started = False  # guards against start_downloads running twice
         self.setFixedWidth(500)
         self.setFixedHeight(350)
         self.selected_pronunciation: Pronunciation = None
@@ -42,7 +119,7 @@ class BulkAdd(QDialog):
         self.hlayout.addLayout(self.layout)
         self.setLayout(self.hlayout)
         self.description = "<h1>anki-forvo-dl</h1><p>anki-forvo-dl will download audio files for the selected cards based on the selected search field and put the audio in the selected audio field.</p><p>You can change these fields by going to the add-on's directory > user_files > config.json and changing the field names there.</p>"
-        self.description += "<p>Forvo offers their service for free, so please be kind and <b>don't use the bulk-add feature regularly to avoid that Forvo's servers get nuked</b>. %s cards mean %s requests to their servers. There is a delay of a second between the downloads to protect them. Try to download the audio files as you create your cards, using the blue Forvo button in the editor.</p>" % (str(len(self.unique_cards)), str(len(self.unique_cards) * 2))
+        self.description += "<p>Forvo offers their service for free, so please be kind and <b>don't use the bulk-add feature regularly to avoid that Forvo's servers get nuked</b>. %s cards mean %s requests to their servers. There is a delay of a second between the downloads to protect them. Try to download the audio files as you create your cards, using the blue Forvo button in the editor.</p>" % (str(self.n), str(self.n2))
         self.description_label = QLabel(text=self.description)
         self.description_label.setMinimumWidth(450)
         self.description_label.setStyleSheet("margin: 0; padding: 0;")
@@ -58,6 +135,7 @@ class BulkAdd(QDialog):
         self.btn.clicked.connect(self.start_downloads_wrapper)
         self.layout.addWidget(self.btn)
 
+        load_jp_cache()  # warm the Japanese lookup cache from the previous bulk add
         self.th = Thread(self.unique_cards, mw, config)  # Initialize Thread
 
         def change_skip_existing_option(skip_existing: bool, config_object):
@@ -91,14 +169,13 @@ class BulkAdd(QDialog):
         self.layout.addLayout(self.btn_box)
 
         self.progress = QProgressBar()
-        self.progress.setMaximum(len(self.unique_cards))
         self.progress.setMinimum(0)
         self.progress.setVisible(False)
         self.layout.addWidget(self.progress)
 
         # connect thread's signals to handler functions
         self.th.change_value.connect(self.progress.setValue)
-        self.th.log.connect(self.add_log_msg)
+        self.th.log_batch.connect(self.add_log_batch)
         self.th.finished.connect(self.review_downloads)
 
         self.parent = parent
@@ -106,21 +183,21 @@ class BulkAdd(QDialog):
         self.adjustSize()
         self.log: List[str] = []
 
-        scroll_widget = QWidget()
-        scroll_widget.setStyleSheet("background-color: #fff;")
+        """A single read-only text view appends in O(1) and reuses its document,
+        unlike one QLabel per message which relayouts the whole column each time"""
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumBlockCount(5000)  # bounds memory on huge runs
+        self.log_view.setStyleSheet("background-color: #fff; color: #000;")
         self.scroll_area = QScrollArea()
-        self.scroll_vbox = QVBoxLayout(scroll_widget)
-
-        self.scroll_area.setWidget(scroll_widget)
+        self.scroll_area.setWidget(self.log_view)
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setVisible(False)
         self.description_label.adjustSize()
 
-    def add_log_msg(self, msg: str):
-        self.log.append(msg)
-        label = QLabel("<code>%s</code>" % msg)
-        label.setStyleSheet("color: #000;")
-        self.scroll_vbox.addWidget(label)
+    def add_log_batch(self, msgs: List[str]):
+        self.log.extend(msgs)
+        self.log_view.appendPlainText("\n".join(msgs))
 
     def review_downloads(self):
         """Opens the FailedDownloadsDialog after downloads are completed"""
@@ -153,8 +230,7 @@ class BulkAdd(QDialog):
 
     def handle_cancel_click(self):
         """Cancel button"""
-        self.th.is_cancelled = True
-        self.th._status = True  # allow thread to continue working so that it hits the if-statement that will cancel the thread
+        self.th.cancel()
 
     @pyqtSlot()
     def handle_toggle_log_click(self):
@@ -162,97 +238,102 @@ class BulkAdd(QDialog):
         self.scroll_area.setVisible(not self.scroll_area.isVisible())
         self.adjustSize()
 
-    def select_lang(self, missing):
-        """Recursive function that addresses all cards' decks that are missing a language"""
-        deck_id = missing[len(missing) - 1]
-        d = LanguageSelector(self.parent, self.mw.col.decks.get(deck_id)["name"])
-
-        def handle_lang_select():
-            if d.selected_lang is not None:
-                self.config.set_deck_specific_config_object(
-                    ConfigObject(name="language", value=d.selected_lang, deck=deck_id))
-                if len(missing) > 1:
-                    """If some decks are still missing, address them"""
-                    missing.pop()
-                    self.select_lang(missing)
-                else:
-                    """If all conflicts are done, start the downloads (yay)"""
-                    self.start_downloads()
+    def _ask_next_lang(self):
+        """Shows the LanguageSelector for the next deck in the queue. Iterative, so the
+        previous dialog is gone before the next appears instead of a chain of live
+        closures keeping them all alive."""
+        self._lang_deck_id = self._lang_queue.popleft()
+        self._lang_dialog = LanguageSelector(self.parent, self.mw.col.decks.get(self._lang_deck_id)["name"])
+        self._lang_dialog.finished.connect(self._on_lang_selected)
+        self._lang_dialog.show()
+
+    def _on_lang_selected(self):
+        d = self._lang_dialog
+        self._lang_dialog = None
+        if d.selected_lang is not None:
+            self.config.set_deck_specific_config_object(
+                ConfigObject(name="language", value=d.selected_lang, deck=self._lang_deck_id))
+            if len(self._lang_queue) > 0:
+                """If some decks are still missing, address them"""
+                self._ask_next_lang()
             else:
-                """dummy didn't select a language"""
-                showInfo("Cancelled download because no language was selected.")
-                return
-
-        d.finished.connect(handle_lang_select)
-        d.show()
+                """If all conflicts are done, start the downloads (yay)"""
+                self.start_downloads()
+        else:
+            """dummy didn't select a language"""
+            showInfo("Cancelled download because no language was selected.")
+            return
 
     def ensure_languages(self):
         """Ensures that the language is set for all selected decks; otherwise show dialog"""
-        missing = list(set([card.did for card in self.unique_cards if
-                            self.config.get_deck_specific_config_object("language", card.did) is None]))
+        missing = [did for did in self._card_dids if
+                   self.config.get_deck_specific_config_object("language", did) is None]
         if len(missing) > 0:
-            self.select_lang(missing)
+            self._lang_queue = deque(missing)
+            self._ask_next_lang()
         else:
             self.start_downloads()
 
     def start_downloads_wrapper(self):
         """Starts the whole procedure that involves ensuring fields and ensuring languages"""
-        if len(self.unique_cards) > 350:
-            if not askUser(title="Disclaimer", text="It has been reported that Forvo bans IPs that are downloading too many audios. You have selected %s cards, resulting in %s requests to the server. <b>Please consider to spread your downloads over a few days to avoid getting IP-banned by Forvo.</b>\nYou are responsible for what you download with this tool. Do you really want to continue?" % (str(len(self.unique_cards)), str(len(self.unique_cards) * 2))):
+        if self.n > 350:
+            if not askUser(title="Disclaimer", text="It has been reported that Forvo bans IPs that are downloading too many audios. You have selected %s cards, resulting in %s requests to the server. <b>Please consider to spread your downloads over a few days to avoid getting IP-banned by Forvo.</b>\nYou are responsible for what you download with this tool. Do you really want to continue?" % (str(self.n), str(self.n2))):
                 self.close()
                 return
         self.ensure_fields()
 
-    def select_field(self, missing_ids: List[int], field_type: str):
-        """Recursive function that addresses all decks that are missing the field assignment"""
-        note_type = missing_ids[len(missing_ids) - 1]
-        d = FieldSelector(self.parent, self.mw, note_type, field_type, self.config)
-
-        def handle_field_select():
-            if d.selected_field is not None:
-                self.config.set_note_type_specific_config_object(
-                    ConfigObject(name=field_type, value=d.selected_field, note_type=note_type))
-                if len(missing_ids) > 1:
-                    missing_ids.pop()
-                    self.select_field(missing_ids, field_type)
-                else:
-                    if field_type == "audioField":
-                        """If the program asked for audioFields (which come after the searchFields) and it's done, start the ensure_languages procedure"""
-                        self.ensure_languages()
-                        return
-                    # POV: Asked for searchField -> now ask for audioField
-                    new_missing = list(set([card.note_type()["id"] for card in self.unique_cards if
-                                            self.config.get_note_type_specific_config_object("audioField",
-                                                                                             card.note_type()[
-                                                                                                 "id"]) is None]))
-
-                    if len(new_missing) > 0:
-                        self.select_field(new_missing, "audioField")
-                    else:
-                        """If none cards are missing their audioField, ensure the languages!"""
-                        self.ensure_languages()
+    def _ask_next_field(self):
+        """Shows the FieldSelector for the next note type in the queue; same iterative
+        pattern as _ask_next_lang."""
+        self._field_note_type = self._field_queue.popleft()
+        self._field_dialog = FieldSelector(self.parent, self.mw, self._field_note_type, self._field_type, self.config)
+        self._field_dialog.finished.connect(self._on_field_selected)
+        self._field_dialog.show()
+
+    def _on_field_selected(self):
+        d = self._field_dialog
+        self._field_dialog = None
+        if d.selected_field is not None:
+            self.config.set_note_type_specific_config_object(
+                ConfigObject(name=self._field_type, value=d.selected_field, note_type=self._field_note_type))
+            if len(self._field_queue) > 0:
+                self._ask_next_field()
             else:
-                """dummy didn't select their fields"""
-                showInfo("Cancelled download because field wasn't selected.")
-                return
+                if self._field_type == "audioField":
+                    """If the program asked for audioFields (which come after the searchFields) and it's done, start the ensure_languages procedure"""
+                    self.ensure_languages()
+                    return
+                # POV: Asked for searchField -> now ask for audioField
+                new_missing = [ntid for ntid in self._card_ntids if
+                               self.config.get_note_type_specific_config_object("audioField", ntid) is None]
+
+                if len(new_missing) > 0:
+                    self.select_field(new_missing, "audioField")
+                else:
+                    """If none cards are missing their audioField, ensure the languages!"""
+                    self.ensure_languages()
+        else:
+            """dummy didn't select their fields"""
+            showInfo("Cancelled download because field wasn't selected.")
+            return
 
-        d.finished.connect(handle_field_select)
-        d.show()
+    def select_field(self, missing_ids: List[int], field_type: str):
+        """Queues up all note types that are missing the field assignment and asks one by one"""
+        self._field_queue = deque(missing_ids)
+        self._field_type = field_type
+        self._ask_next_field()
 
     def ensure_fields(self):
-        missing = list(set([card.note_type()["id"] for card in self.unique_cards if
-                            self.config.get_note_type_specific_config_object("searchField",
-                                                                             card.note_type()["id"]) is None]))
+        missing = [ntid for ntid in self._card_ntids if
+                   self.config.get_note_type_specific_config_object("searchField", ntid) is None]
         if len(missing) > 0:
             """If some cards don't have their searchFields assigned yet, beg the user to do so!"""
             self.select_field(missing, "searchField")
         else:
             """If all cards have a searchField assigned:"""
 
-            new_missing = list(set([card.note_type()["id"] for card in self.unique_cards if
-                                    self.config.get_note_type_specific_config_object("audioField",
-                                                                                     card.note_type()[
-                                                                                         "id"]) is None]))
+            new_missing = [ntid for ntid in self._card_ntids if
+                           self.config.get_note_type_specific_config_object("audioField", ntid) is None]
             if len(new_missing) > 0:
                 """Cards have the searchField assignment but are lacking the audioField one"""
                 self.select_field(new_missing, "audioField")
@@ -262,6 +343,10 @@ class BulkAdd(QDialog):
 
     def start_downloads(self):
         """FINALLY start the downloads"""
+        if self._started:
+            return  # reachable from several dialog-chain paths; never start the thread twice
+        self._started = True
+        self.progress.setMaximum(len(self.th.cards))  # progress counts cards, set once the final card set is known
         self.skip_existing_checkbox.setVisible(False)
         self.btn.setVisible(False)                # }--- disable some controls and make others visible
         self.pause_button.setVisible(True)                  # }
@@ -280,140 +365,386 @@ class Thread(QThread):
     """The downloading is handled in a separate thread in order for the progress bar and the pause button to work"""
     change_value = pyqtSignal(int)
     done = pyqtSignal(int)
-    log = pyqtSignal(str)
+    log_batch = pyqtSignal(list)
     is_cancelled = False
     done_cards = []
 
+    LOG_FLUSH_INTERVAL = 0.25  # seconds between log batches
+    LOG_FLUSH_COUNT = 32  # ... unless this many lines piled up first
+    PROGRESS_INTERVAL = 0.1  # progress bar updates at ~display rate, not per card
 
     def __init__(self, cards, mw, config):
         QThread.__init__(self)
-        self.cond = QWaitCondition()
-        self.mutex = QMutex()
         self.cnt = 0
         self._status = True
+        self._resume = threading.Event()  # set = running, cleared = paused
+        self._resume.set()
         self.cards = cards
         self.mw = mw
         self.skipped_cards = 0
         self.failed: List[FailedDownload] = []
         self.config: Config = config
+        self.pool: ThreadPoolExecutor = None
+        self._rate_tokens = threading.Semaphore(0)  # refilled at 1 token/sec; 1 token = 1 card
+        self._rate_stop = threading.Event()
+        self._rate_lock = threading.Lock()
+        self._rate_banked = 0  # tokens currently in the bucket; capped so idle time doesn't bank a burst
+        self._rate_cap = 1  # raised to the worker count in run()
+        self._log_lock = threading.Lock()
+        self._pending_logs: List[str] = []
+        self._last_log_emit = 0.0
+        self._last_progress_emit = 0.0
+        self._dl_cache_lock = threading.Lock()
+        self._dl_cache = self._load_dl_cache()
+        self._err_lock = threading.Lock()
+        self._err_fh = None
+
+    @staticmethod
+    def _dl_cache_path() -> str:
+        from . import user_files_dir
+        return os.path.join(user_files_dir, "dl_cache.json")
+
+    def _load_dl_cache(self) -> dict:
+        """Loads the durable "language:query" -> media name memo that lets re-runs
+        reuse audio files downloaded in earlier bulk adds."""
+        try:
+            if os.path.isfile(self._dl_cache_path()):
+                with open(self._dl_cache_path(), "r", encoding="utf8") as f:
+                    return json.load(f)
+        except Exception:
+            pass  # a broken cache file just means we download again
+        return {}
+
+    def _save_dl_cache(self):
+        try:
+            with self._dl_cache_lock:
+                entries = dict(self._dl_cache)
+            with open(self._dl_cache_path(), "w", encoding="utf8") as f:
+                f.write(json.dumps(entries))
+        except Exception:
+            pass
 
     def __del__(self):
         self.wait()
 
-    def run(self):
-        from . import log_dir
-
-        skip_existing = self.config.get_config_object("skipExistingBulkAdd").value
-
-        card: Card
-        for card in self.cards:
-            """Go through all cards that are selected in the editor"""
-            # self.mutex.lock()
-            if self.is_cancelled:
-                Forvo.cleanup()
+    def _log(self, msg: str):
+        """Buffers a log line; batches cross the thread boundary instead of one Qt
+        queued call (and one new widget on the other side) per line."""
+        with self._log_lock:
+            self._pending_logs.append(msg)
+            now = time.monotonic()
+            if now - self._last_log_emit < self.LOG_FLUSH_INTERVAL and len(self._pending_logs) < self.LOG_FLUSH_COUNT:
                 return
-            if not self._status:  # If download is paused, wait
-                self.cond.wait(self.mutex)
-            try:  # use try to avoid stopping the entire thread because of a single exception
-                # Get fields from config
-
-                query_field = self.config.get_note_type_specific_config_object("searchField", card.note_type()["id"]).value
-                audio_field = self.config.get_note_type_specific_config_object("audioField", card.note_type()["id"]).value
-
-                if query_field not in card.note():
-                    raise FieldNotFoundException(query_field)
-
-                if audio_field not in card.note():
-                    raise FieldNotFoundException(audio_field)
-
-                query = card.note()[query_field]  # Get query string from card's note using field name
-                language = self.config.get_deck_specific_config_object("language", card.did).value
-
-                self.log.emit("[Next Card] Query: %s; Language: %s" % (query, language))
-
-                if skip_existing and len(card.note()[audio_field]) > 0:
-                    """Skip cards that already have something in the audio field if the setting is turned on"""
-                    self.skipped_cards += 1
-                    continue
-
-
-                # Get language from config for the card's deck
-
-                # Get the results
-                results = Forvo(query, language, self.mw, self.config)
-                # if results is not None:
+            batch, self._pending_logs = self._pending_logs, []
+            self._last_log_emit = now
+        self.log_batch.emit(batch)
+
+    def _flush_logs(self):
+        with self._log_lock:
+            batch, self._pending_logs = self._pending_logs, []
+        if batch:
+            self.log_batch.emit(batch)
+
+    def _refill_tokens(self):
+        """Leaky bucket that hands out one download token per second so that Forvo's
+        servers never see more than one card's worth of requests per second,
+        no matter how many workers are running. The bucket is capped at the worker
+        count: stretches where no tokens are spent (cache hits, a paused run) must
+        not bank a surplus that would later let the workers download unthrottled."""
+        while not self._rate_stop.is_set():
+            with self._rate_lock:
+                if self._rate_banked < self._rate_cap:
+                    self._rate_banked += 1
+                    self._rate_tokens.release()
+            self._rate_stop.wait(1)
+
+    def _acquire_token(self) -> bool:
+        """Waits for a download token. Returns False if the run was cancelled while waiting."""
+        while not self._rate_tokens.acquire(timeout=0.2):
+            if self.is_cancelled:
+                return False
+        with self._rate_lock:
+            self._rate_banked -= 1
+        return True
+
+    def _group_key(self, card: Card, note, ntid):
+        """Cards whose search field content and language match share a single download."""
+        query_field = self._search_by_nt.get(ntid)
+        if query_field is None or query_field not in note:
+            return None, card.id  # no usable query; process (and fail) the card on its own
+        return note[query_field].strip(), self._lang_by_did.get(card.did)
+
+    def _record_failure(self, card: Card, e: Exception):
+        """Saves a raised exception so it can be retrieved later in the FailedDownloadsDialog"""
+        self.failed.append(FailedDownload(reason=e, card=card))
+        try:
+            first_field = card.note().fields[0]
+        except Exception:
+            """cards can end up here precisely because their note can't be loaded -
+            the failure path itself must not raise for them"""
+            first_field = "<unknown>"
+        self._log("[Error] Card with 1. Field %s failed due to Exception: %s" % (first_field, str(e)))
+        with self._err_lock:
+            if self._err_fh is None:
+                self._err_fh = open(self._err_path, "a", encoding="utf8", buffering=1)
+            self._err_fh.write("\n".join(traceback.format_exception(None, e, e.__traceback__)) + "\n------------------\n")
+        self.done_cards.append(card)
+
+    def _apply_audio(self, card: Card, media_name: str):
+        """Writes the sound string for an already downloaded media file into a card's audio field."""
+        note = card.note()
+        audio_field = self._audio_by_nt[card.note_type()["id"]]
+        if audio_field is None or audio_field not in note:
+            raise FieldNotFoundException(audio_field)
+        if self._append_audio:
+            note[audio_field] += "[sound:%s]" % media_name  # set audio field content to the respective sound
+            self._log("Appended sound string to field content")
+        else:
+            note[audio_field] = "[sound:%s]" % media_name  # set audio field content to the respective sound
+            self._log("Placed sound string in field")
+        note.flush()  # flush the toilet
+        self._log("Saved note")
+
+    def _should_skip(self, note, ntid) -> bool:
+        """Skip cards that already have something in the audio field if the setting is
+        turned on. Checked before any other per-card work, so a warm re-run over a
+        mostly-populated deck costs one field read per card and nothing else."""
+        audio_field = self._audio_by_nt.get(ntid)
+        return audio_field is not None and audio_field in note and len(note[audio_field]) > 0
+
+    def _process_group(self, remaining: List[Card]):
+        """Downloads the audio for one (query, language) group and saves it into every
+        card of the group. Runs on a pool worker."""
+        if self.is_cancelled:
+            return
+        self._resume.wait()  # If download is paused, wait
+
+        card = remaining[0]  # all cards in the group share the same query and language
+        try:  # use try to avoid stopping the entire run because of a single exception
+            # Get fields from config (resolved once per note type / deck in run())
+            note = card.note()
+            ntid = card.note_type()["id"]
+            query_field = self._search_by_nt[ntid]
+            audio_field = self._audio_by_nt[ntid]
+
+            if query_field is None or query_field not in note:
+                raise FieldNotFoundException(query_field)
+
+            if audio_field is None or audio_field not in note:
+                raise FieldNotFoundException(audio_field)
+
+            query = note[query_field]  # Get query string from card's note using field name
+            language = self._lang_by_did[card.did]
+
+            self._log("[Next Card] Query: %s; Language: %s (%s card%s)"
+                          % (query, language, str(len(remaining)), "s" if len(remaining) != 1 else ""))
+
+            cache_key = "%s:%s" % (language, query.strip())
+            with self._dl_cache_lock:
+                media_name = self._dl_cache.get(cache_key)
+            if media_name is not None and os.path.exists(os.path.join(self.mw.col.media.dir(), media_name)):
+                """A previous bulk add already fetched this word - reuse the media file"""
+                self._log("Reusing previously downloaded audio for query %s" % query)
+            else:
+                if not self._acquire_token():  # keep the global 1 request/sec promise towards Forvo
+                    return
+
+                media_name = self._download_audio(query, language)
+                with self._dl_cache_lock:
+                    self._dl_cache[cache_key] = media_name
+        except Exception as e:
+            for c in remaining:
+                self._record_failure(c, e)
+            return
+
+        for c in remaining:
+            try:
+                self._apply_audio(c, media_name)
+                self.done_cards.append(c)
+            except Exception as e:
+                self._record_failure(c, e)
+
+    def _download_audio(self, query: str, language: str) -> str:
+        """Downloads the best pronunciation for a query, adds it to Anki's media
+        collection and returns the media name. For Japanese, JapanesePod101 is
+        tried first with Forvo as the fallback."""
+        # Get the results
+        results = Forvo(query, language, self.mw, self.config)
+        # if results is not None:
+        try:
+            if language == "ja":
+                self._log("Trying to download from JapanesePod101")
+                key_hasher = _md5_hasher()  # hashlib.md5() would raise on FIPS-enabled builds
+                key_hasher.update(query.encode("utf8"))
+                query_key = key_hasher.hexdigest()
+                with _jp_cache_lock:
+                    kana = _JISHO_CACHE.get(query_key)
+                if kana is None:
+                    res_jisho = _SESSION.get(JISHO_SEARCH_URL + urllib.parse.quote(query), timeout=10)
+                    kana = res_jisho.json()["data"][0]["japanese"][0]["reading"]
+                    with _jp_cache_lock:
+                        _JISHO_CACHE[query_key] = kana
+                dl_path = os.path.join(self._temp_dir, "pronunciation_" + "ja" + "_" + query + ".mp3")
                 try:
-                    if language == "ja":
-                        self.log.emit("Trying to download from JapanesePod101")
-                        import urllib.request
-                        import urllib.parse
-                        import json
-                        japanesePod_url = "http://assets.languagepod101.com/dictionary/japanese/audiomp3.php?"
-                        jisho_search_url = "https://jisho.org/api/v1/search/words?keyword=";
-                        req_jisho = urllib.request.Request(jisho_search_url + urllib.parse.quote(query))
-                        res_jisho = urllib.request.urlopen(req_jisho)
-                        kana = json.load(res_jisho)["data"][0]["japanese"][0]["reading"]
-                        req_japanesePod101 = urllib.request.Request(japanesePod_url + "kanji=" + urllib.parse.quote(query) + "&kana=" + urllib.parse.quote(kana))
-                        from . import temp_dir
-                        dl_path = os.path.join(temp_dir, "pronunciation_" + "ja" + "_" + query + ".mp3")
-                        try:
-                            res: HTTPResponse = urllib.request.urlopen(req_japanesePod101)
-                            with open(dl_path, "wb") as f:
-                                f.write(res.read())
-                                res.close()
-                            if md5(dl_path) == "7e2c2f954ef6051373ba916f000168dc":
+                    audio_key = (query, kana)
+                    with _jp_cache_lock:
+                        have_cached = audio_key in _JP101_CACHE
+                        audio_bytes = _JP101_CACHE.get(audio_key)
+                    if have_cached and audio_bytes is None:
+                        raise NoResultsException  # JapanesePod101 is known to have no audio for this word
+                    tmp_path = dl_path + ".part"  # write to a temp name, publish atomically once complete
+                    if audio_bytes is not None:
+                        """Cached bytes were already checked against the sentinel when first fetched"""
+                        with open(tmp_path, "wb") as f:
+                            f.write(audio_bytes)
+                        os.replace(tmp_path, dl_path)
+                    else:
+                        chunks = []
+                        hasher = _md5_hasher()
+                        with _SESSION.get(JAPANESE_POD_URL, params={"kanji": query, "kana": kana},
+                                          timeout=10, stream=True) as res:
+                            if int(res.headers.get("Content-Length") or 0) == SENTINEL_SIZE:
+                                """The announced size already gives away the "no results" clip -
+                                skip the body, the disk write and the hash entirely"""
+                                with _jp_cache_lock:
+                                    _JP101_CACHE[audio_key] = None
                                 raise NoResultsException
-                            media_name = self.mw.col.media.add_file(dl_path)
-                            if self.config.get_config_object("appendAudio").value:
-                                card.note()[audio_field] += "[sound:%s]" % media_name  # set audio field content to the respective sound
-                                self.log.emit("Appended sound string to field content")
-                            else:
-                                card.note()[audio_field] = "[sound:%s]" % media_name  # set audio field content to the respective sound
-                                self.log.emit("Placed sound string in field")
-                            card.note().flush()  # flush the toilet
-                            self.log.emit("Saved note")
-                        except Exception as e:
+                            with open(tmp_path, "wb") as f:
+                                for chunk in res.iter_content(64 * 1024):
+                                    hasher.update(chunk)  # hash while writing, no second read from disk
+                                    f.write(chunk)
+                                    chunks.append(chunk)  # body is also kept for the per-run replay cache
+                        audio_bytes = b"".join(chunks)
+                        os.replace(tmp_path, dl_path)
+                        # defense in depth for responses without a Content-Length header
+                        if len(audio_bytes) == SENTINEL_SIZE and hasher.hexdigest() == SENTINEL_MD5:
+                            os.remove(dl_path)
+                            with _jp_cache_lock:
+                                _JP101_CACHE[audio_key] = None
                             raise NoResultsException
-                    else:
-                        raise NoResultsException
+                    with _jp_cache_lock:
+                        _JP101_CACHE[audio_key] = audio_bytes
+                    return self.mw.col.media.add_file(dl_path)
                 except Exception as e:
-                    results = results.load_search_query().get_pronunciations().pronunciations
-                    results.sort(key=lambda result: result.votes)  # sort by votes
-
-                    top: Pronunciation = results[len(results) - 1]  # get most upvoted pronunciation
-                    self.log.emit("Selected pronunciation by %s with %s votes" % (top.user, str(top.votes)))
-                    top.download_pronunciation()  # download that
-                    self.log.emit("Downloaded pronunciation")
-                    if self.config.get_config_object("appendAudio").value:
-                        card.note()[audio_field] += "[sound:%s]" % top.audio  # set audio field content to the respective sound
-                        self.log.emit("Appended sound string to field content")
-                    else:
-                        card.note()[audio_field] = "[sound:%s]" % top.audio  # set audio field content to the respective sound
-                        self.log.emit("Placed sound string in field")
-
-                    card.note().flush()  # flush the toilet
-                    self.log.emit("Saved note")
-            except Exception as e:
-                # Save all raised exceptions in a list to retrieve them later in the FailedDownloadsDialog
-                self.failed.append(FailedDownload(reason=e, card=card))
-                self.log.emit("[Error] Card with 1. Field %s failed due to Exception: %s" % (card.note().fields[0], str(e)))
-                with open(os.path.join(log_dir, "bulk_error_log-" + datetime.now().strftime('%Y-%m-%dT%H') + ".log"), "a", encoding="utf8") as f:
-                    f.write("\n".join(traceback.format_exception(None, e, e.__traceback__)) + "\n------------------\n")
-
-
-            self.done_cards.append(card)
-            self.cnt += 1  # Increase count for progress bar
-            self.change_value.emit(self.cnt)  # emit signal to update progress bar
-            self.msleep(1000)  # sleep to give progress bar time to update
+                    raise NoResultsException
+            else:
+                raise NoResultsException
+        except Exception as e:
+            pronunciations = results.load_search_query().get_pronunciations().pronunciations
+            top: Pronunciation = max(pronunciations, key=lambda result: result.votes)  # get most upvoted pronunciation
+            self._log("Selected pronunciation by %s with %s votes" % (top.user, str(top.votes)))
+            top.download_pronunciation()  # download that
+            self._log("Downloaded pronunciation")
+            return top.audio
 
-            # self.mutex.unlock()
+    def run(self):
+        # deferred: the package __init__ imports this module before those paths exist
+        from . import log_dir, temp_dir
+        self._temp_dir = temp_dir
 
-        Forvo.cleanup()  # cleanup files in temp directory (None is passed as the self parameter here)
+        skip_existing = self.config.get_config_object("skipExistingBulkAdd").value
+        self._append_audio = self.config.get_config_object("appendAudio").value
+
+        """One line-buffered handle for the whole run instead of a fresh open() per
+        failed card; this also keeps one run in one file when the hour rolls over.
+        Opened lazily on the first failure so clean runs don't leave empty logs."""
+        self._err_path = os.path.join(log_dir, "bulk_error_log-" + datetime.now().strftime('%Y-%m-%dT%H') + ".log")
+
+        def value_of(config_object):
+            return config_object.value if config_object is not None else None
+
+        """Resolve the per-note-type and per-deck config once up front instead of
+        walking the config lists again for every card"""
+        self._search_by_nt = {ntid: value_of(self.config.get_note_type_specific_config_object("searchField", ntid))
+                              for ntid in {card.note_type()["id"] for card in self.cards}}
+        self._audio_by_nt = {ntid: value_of(self.config.get_note_type_specific_config_object("audioField", ntid))
+                             for ntid in self._search_by_nt}
+        self._lang_by_did = {did: value_of(self.config.get_deck_specific_config_object("language", did))
+                             for did in {card.did for card in self.cards}}
+
+        workers = self.config.get_config_object("bulkAddWorkers").value
+        max_workers = max(1, min(int(workers), 3))  # hard cap of 3 to protect Forvo's servers
+        self._rate_cap = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        refill_thread = threading.Thread(target=self._refill_tokens, daemon=True)
+        refill_thread.start()
+
+        """Collapse cards that would download the exact same audio into one group,
+        so duplicated expressions across the selection cost a single download.
+        Cards whose audio field is already filled never reach the pool at all."""
+        groups: dict = {}
+        for card in self.cards:
+            try:
+                # fetch the note and note type id once per card; both hit Anki's collection
+                note = card.note()
+                ntid = card.note_type()["id"]
+            except Exception:
+                """unresolvable cards go through the pool alone and fail with a proper record"""
+                groups.setdefault((None, card.id), []).append(card)
+                continue
+            if skip_existing and self._should_skip(note, ntid):
+                self.skipped_cards += 1
+                self.done_cards.append(card)
+                self.cnt += 1
+                continue
+            groups.setdefault(self._group_key(card, note, ntid), []).append(card)
+        if self.cnt > 0:
+            self.change_value.emit(self.cnt)  # show skipped cards immediately
+
+        try:
+            """cancel() can shut the pool down while the grouping loop above is still
+            running (it does one collection lookup per card); submitting into a
+            shut-down pool raises RuntimeError, which is just another way of being
+            cancelled and must not escape run()"""
+            futures = {}
+            if not self.is_cancelled:
+                try:
+                    futures = {self.pool.submit(self._process_group, group): group
+                               for group in groups.values()}
+                except RuntimeError:
+                    pass  # cancelled between the flag check and the submit
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    future.result()  # exceptions are handled per card inside _process_group ...
+                except Exception as e:
+                    """... but anything that still escapes must not abort this loop and
+                    silently drop the remaining groups; fail the group's cards instead"""
+                    for c in futures[future]:
+                        self._record_failure(c, e)
+                self.cnt += len(futures[future])  # Increase count for progress bar; progress still counts cards
+                now = time.monotonic()
+                if now - self._last_progress_emit >= self.PROGRESS_INTERVAL:
+                    self._last_progress_emit = now
+                    self.change_value.emit(self.cnt)  # emit signal to update progress bar
+        finally:
+            self.change_value.emit(self.cnt)  # make sure the bar shows the final state
+            self._flush_logs()
+            self._rate_stop.set()
+            self.pool.shutdown(wait=False)
+            Forvo.cleanup()  # cleanup files in temp directory (None is passed as the self parameter here)
+            save_jp_cache()
+            self._save_dl_cache()
+            with _jp_cache_lock:
+                _JP101_CACHE.clear()  # per-run memo only; the raw mp3 bytes must not sit in RAM for the whole session
+            if self._err_fh is not None:
+                self._err_fh.close()
+
+    def cancel(self):
+        """Cancels the run: pending cards are dropped, running ones finish up."""
+        self.is_cancelled = True
+        self._status = True  # let paused workers continue so that they hit the cancellation checks
+        self._resume.set()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
 
     def toggle_status(self):  # toggle pause state
         self._status = not self._status
         if self._status:
-            self.cond.wakeAll()
+            self._resume.set()
+        else:
+            self._resume.clear()
 
     @property
     def status(self):
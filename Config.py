@@ -17,6 +17,10 @@ class Config:
     def __init__(self, config_path: str, template_path: str):
         self.config_path = config_path
         self.template_path = template_path
+        """Memo for get_note_type_specific_config_object, which otherwise walks the
+        noteTypeSpecific list on every call; the editor button hits it on every press.
+        Misses are cached as None too. Invalidated on writes."""
+        self._nt_cache = {}  # (name, note_type_id) -> ConfigObject or None
 
     def load_config(self):
         """Loads the config from the file into memory"""
@@ -92,11 +96,15 @@ class Config:
         return None
 
     def get_note_type_specific_config_object(self, name: str, note_type_id: int) -> 'ConfigObject':
+        cache_key = (name, note_type_id)
+        if cache_key in self._nt_cache:
+            return self._nt_cache[cache_key]
+        result = None
         for note_type in self.config["noteTypeSpecific"]:
             note_type: dict
             if note_type["id"] == note_type_id:
                 if name in note_type.keys():
-                    return ConfigObject(
+                    result = ConfigObject(
                         name,
                         self.template["noteTypeSpecific"][name]["friendly"],
                         self.template["noteTypeSpecific"][name]["description"],
@@ -104,9 +112,9 @@ class Config:
                         note_type[name],
                         note_type=note_type_id
                     )
-                else:
-                    return None
-        return None
+                break
+        self._nt_cache[cache_key] = result
+        return result
 
     def set_deck_specific_config_object(self, config_object: 'ConfigObject', use_default_as_fallback=False):
         existing: list = self.config["deckSpecific"]
@@ -130,6 +138,7 @@ class Config:
         existing_options_for_note_type[config_object.name] = config_object.value or config_object.default
         existing.append(existing_options_for_note_type)
         self.config["noteTypeSpecific"] = existing
+        self._nt_cache.pop((config_object.name, config_object.note_type), None)  # drop the now-stale memo entry
         self._save()
 
     def get_template(self, option: str, category=None):
@@ -1,12 +1,12 @@
 import base64
 import os
 import re
-import urllib.request
 import urllib.parse
 from dataclasses import dataclass
-from http.client import HTTPResponse
 from typing import List, Union
-from urllib.error import HTTPError
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from aqt import AnkiQt
 from bs4 import BeautifulSoup, Tag
@@ -19,6 +19,23 @@ from .pydub import AudioSegment
 search_url = "https://forvo.com/word/"
 download_url = "https://forvo.com/download/mp3/"
 
+"""Parsing the result page dominates the CPU side of a lookup. lxml's C parser is
+several times faster than the pure-Python html.parser, but it doesn't ship with
+every Anki build, so probe for it once and fall back gracefully."""
+try:
+    import lxml  # noqa: F401
+    _bs4_parser = "lxml"
+except ImportError:
+    _bs4_parser = "html.parser"
+
+"""One keep-alive session shared by all searches and pronunciation downloads, so
+the TLS handshake to forvo.com and the audio CDN is only paid on the first request.
+The browser user agent is set so that Forvo/CloudFlare lets us access the page."""
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.47 Safari/537.36"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 
 @dataclass
 class Pronunciation:
@@ -36,13 +53,13 @@ class Pronunciation:
     def download_pronunciation(self):
         """Downloads the pronunciation using the pronunciation url in the pronunciation object, adds the audio to Anki's DB and stores the media id in the pronunciation object."""
         from . import temp_dir
-        req = urllib.request.Request(self.download_url)
         dl_path = os.path.join(temp_dir, "pronunciation_" + self.language + "_" + self.word + (
             ".ogg" if self.is_ogg else ".mp3"))
-        with open(dl_path, "wb") as f:
-            res: HTTPResponse = urllib.request.urlopen(req)
-            f.write(res.read())
-            res.close()
+        with _SESSION.get(self.download_url, timeout=30, stream=True) as res:
+            res.raise_for_status()
+            with open(dl_path, "wb") as f:
+                for chunk in res.iter_content(64 * 1024):
+                    f.write(chunk)  # stream to disk instead of buffering the whole file
 
         if self.is_ogg:
             print("Converting ogg to mp3")
@@ -77,27 +94,23 @@ class Forvo:
         self.pronunciations: List[Pronunciation] = []
         self.mw = mw
 
-        # Set a user agent so that Forvo/CloudFlare lets us access the page
-        opener = urllib.request.build_opener()
-        opener.addheaders = [('User-Agent', 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_9_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/35.0.1916.47 Safari/537.36')]
-        urllib.request.install_opener(opener)
-
     def load_search_query(self):
         """Loads the search result page on Forvo"""
         try:
             log_debug("[Forvo.py] Reading result page")
-            page = urllib.request.urlopen(url=search_url + urllib.parse.quote_plus(self.word)).read()
+            res = _SESSION.get(search_url + urllib.parse.quote_plus(self.word), timeout=30)
+            res.raise_for_status()
+            page = res.content
             log_debug("[Forvo.py] Done with reading result page")
 
             log_debug("[Forvo.py] Initializing BS4")
-            self.html = BeautifulSoup(page, "html.parser")
+            self.html = BeautifulSoup(page, _bs4_parser)
             log_debug("[Forvo.py] Initialized BS4")
             return self
         except Exception as e:
             log_debug("[Forvo.py] Exception: " + str(e))
-            if isinstance(e, HTTPError):
-                e: HTTPError
-                if e.code == 404:
+            if isinstance(e, requests.HTTPError):
+                if e.response is not None and e.response.status_code == 404:
                     raise NoResultsException()  # Interpret 404 http error code as no results found
             else:
                 raise e  # otherwise, raise the exception as usual
@@ -1,8 +1,10 @@
-import pathlib
+import time
+from collections import OrderedDict
 from typing import List, Tuple
 
 import anki
 from anki.hooks import addHook
+from anki.utils import ids2str
 from aqt import mw, gui_hooks
 from aqt.browser import Browser
 from aqt.editor import Editor
@@ -20,39 +22,86 @@ from .Forvo import Forvo, Pronunciation
 from .LanguageSelector import LanguageSelector
 from .Util import get_field_id
 
-"""Paths to directories get determined based on __file__"""
-asset_dir = os.path.join(pathlib.Path(__file__).parent.absolute(), "assets")
-temp_dir = os.path.join(pathlib.Path(__file__).parent.absolute(), "temp")
-user_files_dir = os.path.join(pathlib.Path(__file__).parent.absolute(), "user_files")
-log_dir = os.path.join(pathlib.Path(__file__).parent.absolute(), "user_files", "logs")
+"""Paths to directories get determined based on __file__ (resolved just once)"""
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+asset_dir = os.path.join(_base_dir, "assets")
+temp_dir = os.path.join(_base_dir, "temp")
+user_files_dir = os.path.join(_base_dir, "user_files")
+log_dir = os.path.join(user_files_dir, "logs")
 
 debug_mode = os.path.isfile(os.path.join(user_files_dir, ".debug"))
 
 """Ensure directories (create if not existing)"""
 for path in [temp_dir, user_files_dir, log_dir]:
-    if not os.path.exists(path):
-        os.makedirs(path)
+    os.makedirs(path, exist_ok=True)
 
 config = Config(os.path.join(user_files_dir, "config.json"),
                 os.path.join(asset_dir, "config.template.json")).load_config().load_template().ensure_options()
 
+"""Search results are memoized per (query, language) so that reopening the dialog
+on the same word moments later skips the whole Forvo scrape + parse round-trip.
+Forvo's audio links rotate, hence the short lifetime. The media files referenced by
+already-downloaded pronunciations live in Anki's collection, so they stay valid."""
+_SEARCH_CACHE_MAX = 64
+_SEARCH_CACHE_TTL = 10 * 60  # seconds
+_search_cache: "OrderedDict[Tuple[str, str], Tuple[float, List[Pronunciation]]]" = OrderedDict()
 
-def _handle_field_select(d, note_type_id, field_type, editor):
+
+def _cached_pronunciations(query: str, language: str) -> Union[List[Pronunciation], None]:
+    key = (query.strip().lower(), language)
+    hit = _search_cache.get(key)
+    if hit is None or time.time() - hit[0] >= _SEARCH_CACHE_TTL:
+        return None
+    _search_cache.move_to_end(key)
+    return hit[1]
+
+
+def _cache_pronunciations(query: str, language: str, results: List[Pronunciation]):
+    _search_cache[(query.strip().lower(), language)] = (time.time(), results)
+    while len(_search_cache) > _SEARCH_CACHE_MAX:
+        _search_cache.popitem(last=False)
+
+
+def _handle_field_select(d, editor: Editor, deck_id, note_type_id, field_type, remaining: List[str], resolved: dict):
     if d.selected_field is not None:
         config.set_note_type_specific_config_object(
             ConfigObject(name=field_type, value=d.selected_field, note_type=note_type_id))
-        on_editor_btn_click(editor, False)
+        resolved[field_type] = d.selected_field
+        if len(remaining) > 0:
+            select_fields(editor, deck_id, note_type_id, remaining, resolved)
+        else:
+            """All assignments are in place now - run the download directly instead of
+            re-entering on_editor_btn_click and redoing its lookups"""
+            _do_forvo(editor, deck_id, note_type_id, resolved["searchField"], resolved["audioField"], False)
     else:
         showInfo("Cancelled download because fields weren't selected.")
 
 
-def select_field(editor: Editor, note_type_id, field_type):
+def select_fields(editor: Editor, deck_id, note_type_id, field_types: List[str], resolved: dict):
+    """Asks for the missing field assignments one after another; the previously
+    resolved values are carried along in resolved"""
+    field_type = field_types[0]
     d = FieldSelector(editor.parentWindow, editor.mw, note_type_id, field_type, config)
-    d.finished.connect(lambda: _handle_field_select(d, note_type_id, field_type, editor))
+    d.finished.connect(lambda: _handle_field_select(d, editor, deck_id, note_type_id, field_type,
+                                                    field_types[1:], resolved))
     d.show()
 
 
+"""Editors with a request currently in flight; holding down Ctrl+F (key
+auto-repeat) or double-clicking the button would otherwise fire several
+concurrent scrapes against Forvo and open duplicate dialogs. The key is
+released when the request completes - or on the paths that never start one -
+rather than on a timer, since the background scrape outlives any fixed
+debounce window."""
+_inflight = set()
+
+
 def on_editor_btn_click(editor: Editor, choose_automatically: Union[None, bool] = None):
+    key = id(editor)
+    if key in _inflight:
+        return
+    _inflight.add(key)
+
     if choose_automatically is None:
         modifiers = QApplication.keyboardModifiers()
         if modifiers == Qt.ShiftModifier:
@@ -61,23 +110,38 @@ def on_editor_btn_click(editor: Editor, choose_automatically: Union[None, bool]
 
     deck_id = editor.card.did if editor.card is not None else editor.parentWindow.deckChooser.selectedId()
     note_type_id = editor.card.note().mid if editor.card is not None else editor.mw.col.models.current()["id"]
-    search_field = config.get_note_type_specific_config_object("searchField", note_type_id)
-    if search_field is None or search_field.value not in editor.note.keys():
-        select_field(editor, note_type_id, "searchField")
-        return
 
+    """Resolve both field assignments up front. If any are missing, one chain of
+    FieldSelectors collects them all and then starts the download once - previously
+    each missing field re-ran this whole handler and popped its own dialog."""
+    search_field = config.get_note_type_specific_config_object("searchField", note_type_id)
     audio_field = config.get_note_type_specific_config_object("audioField", note_type_id)
-    if audio_field is None or audio_field.value not in editor.note.keys():
-        select_field(editor, note_type_id, "audioField")
+    resolved = {"searchField": search_field.value if search_field is not None else None,
+                "audioField": audio_field.value if audio_field is not None else None}
+    field_names = set(editor.note.keys())  # note.keys() builds a fresh list each call; one set covers both checks
+    missing = [field_type for field_type, value in resolved.items()
+               if value is None or value not in field_names]
+    if len(missing) > 0:
+        _inflight.discard(key)  # no request started; the selector chain takes over
+        select_fields(editor, deck_id, note_type_id, missing, resolved)
         return
 
-    search_field = search_field.value
-    audio_field = audio_field.value
+    _do_forvo(editor, deck_id, note_type_id, resolved["searchField"], resolved["audioField"], choose_automatically)
 
+
+def _do_forvo(editor: Editor, deck_id, note_type_id, search_field: str, audio_field: str,
+              choose_automatically: Union[None, bool]):
+    key = id(editor)  # in-flight marker set by on_editor_btn_click; released on every terminal path
     if editor.note is None:
         showInfo("Please enter a search term in the field '" + search_field + "'.")
+        _inflight.discard(key)
         return
 
+    """The scrape and the download finish asynchronously; by then the user may have
+    moved to another note or closed the editor. Every completion below checks that
+    the editor still shows this note before touching its fields."""
+    note = editor.note
+
     if editor.note is not None and search_field in editor.note.keys() and len(editor.note[search_field]) != 0:
         """If available, use the content of the defined search field as the query"""
         query = editor.note[search_field]
@@ -87,76 +151,115 @@ def on_editor_btn_click(editor: Editor, choose_automatically: Union[None, bool]
         query = editor.note.fields[editor.currentField]
     else:
         showInfo("Please enter a search term in the field '" + search_field + "'.")
+        _inflight.discard(key)
         return
 
     if deck_id is not None:
         def proceed(language):
-            try:
-                forvo = Forvo(query, language, editor.mw, config).load_search_query()
-                if forvo is not None:
-                    results = forvo.get_pronunciations().pronunciations
+            """Resolve the plain config values once up front; both callbacks below
+            reuse them instead of walking the config list again per invocation"""
+            append_audio = config.get_config_object("appendAudio").value
+            play_after = config.get_config_object("playAudioAfterSingleAddAutomaticSelection").value
+
+            def on_results(results: List[Pronunciation]):
+                if choose_automatically:
+                    def add_automatically():
+                        """If shift key is held down"""
+                        top: Pronunciation = max(results, key=lambda result: result.votes)  # get most upvoted pronunciation
+
+                        def on_downloaded(future):
+                            """Runs back on the GUI thread once the download is done"""
+                            try:
+                                future.result()  # re-raises anything download_pronunciation raised
+                            except Exception:
+                                showWarning("Failed to download the pronunciation from Forvo. Please try again.")
+                                return
+                            if editor.note is not note:
+                                return  # the editor moved on while the download ran
+                            try:
+                                fid = get_field_id(audio_field, editor.note)  # resolved once; reused for write and focus
+                                if append_audio:
+                                    editor.note.fields[fid] += "[sound:%s]" % top.audio
+                                else:
+                                    editor.note.fields[fid] = "[sound:%s]" % top.audio
+                            except FieldNotFoundException:
+                                showWarning(
+                                    "Couldn't find field '%s' for adding the audio string. Please create a field with this name or change it in the config for the note type id %s" % (
+                                        audio_field, str(note_type_id)))
+                                return
+
+                            if play_after:  # play audio if desired
+                                anki.sound.play(top.audio)
+
+                            def flush_field():
+                                if not editor.addMode:  # save
+                                    editor.note.flush()
+                                editor.currentField = fid
+                                editor.loadNote(focusTo=fid)
+
+                            editor.saveNow(flush_field, keepFocus=True)
+
+                        """Fetch the mp3 in the background so the editor stays responsive;
+                        taskman calls on_downloaded on the GUI thread afterwards"""
+                        editor.mw.taskman.run_in_background(top.download_pronunciation, on_downloaded)
+
+                    editor.saveNow(add_automatically, keepFocus=False)
                 else:
+                    dialog = AddSingle(editor.parentWindow, pronunciations=results)
+
+                    def handle_close():
+                        Forvo.cleanup()
+                        if editor.note is not note:
+                            return  # the editor moved on while the dialog was open
+                        """audio is still None if the dialog was closed while the
+                        selection's download was in flight (or after it failed)"""
+                        if dialog.selected_pronunciation is not None and dialog.selected_pronunciation.audio is not None:
+                            try:
+                                fid = get_field_id(audio_field, editor.note)
+                                if append_audio:
+                                    editor.note.fields[fid] += "[sound:%s]" % dialog.selected_pronunciation.audio
+                                else:
+                                    editor.note.fields[fid] = "[sound:%s]" % dialog.selected_pronunciation.audio
+                            except FieldNotFoundException:
+                                showWarning(
+                                    "Couldn't find field '%s' for adding the audio string. Please create a field with this name or change it in the config for the note type id %s" % (
+                                        audio_field, str(note_type_id)))
+                            if not editor.addMode:
+                                editor.note.flush()
+                            editor.loadNote()
+
+                    dialog.finished.connect(handle_close)
+                    dialog.show()
+
+            cached = _cached_pronunciations(query, language)
+            if cached is not None:
+                _inflight.discard(key)  # nothing goes over the network for a cache hit
+                on_results(cached)
+                return
+
+            def fetch():
+                forvo = Forvo(query, language, editor.mw, config).load_search_query()
+                if forvo is None:
                     raise Exception()
+                return forvo.get_pronunciations().pronunciations
+
+            def on_fetched(future):
+                """Back on the GUI thread once the scrape is done"""
+                _inflight.discard(key)  # the guard spans exactly the in-flight request
+                try:
+                    results = future.result()
+                except NoResultsException:
+                    showInfo("No results found! :(")
                     return
-            except NoResultsException:
-                showInfo("No results found! :(")
-                return
+                _cache_pronunciations(query, language, results)
+                if editor.note is not note:
+                    return  # the editor moved on during the scrape; the cache entry is kept
+                on_results(results)
 
-            if choose_automatically:
-                def add_automatically():
-                    """If shift key is held down"""
-                    results.sort(key=lambda result: result.votes)  # sort by votes
-                    top: Pronunciation = results[len(results) - 1]  # get most upvoted pronunciation
-                    top.download_pronunciation()  # download that
-                    try:
-                        if config.get_config_object("appendAudio").value:
-                            editor.note.fields[
-                                get_field_id(audio_field, editor.note)] += "[sound:%s]" % top.audio
-                        else:
-                            editor.note.fields[
-                                get_field_id(audio_field, editor.note)] = "[sound:%s]" % top.audio
-                    except FieldNotFoundException:
-                        showWarning(
-                            "Couldn't find field '%s' for adding the audio string. Please create a field with this name or change it in the config for the note type id %s" % (
-                                audio_field, str(note_type_id)))
-
-                    if config.get_config_object("playAudioAfterSingleAddAutomaticSelection").value:  # play audio if desired
-                        anki.sound.play(top.audio)
-
-                    def flush_field():
-                        if not editor.addMode:  # save
-                            editor.note.flush()
-                        editor.currentField = get_field_id(audio_field, editor.note)
-                        editor.loadNote(focusTo=get_field_id(audio_field, editor.note))
-
-                    editor.saveNow(flush_field, keepFocus=True)
-
-                editor.saveNow(add_automatically, keepFocus=False)
-            else:
-                dialog = AddSingle(editor.parentWindow, pronunciations=results)
-
-                def handle_close():
-                    Forvo.cleanup()
-                    if dialog.selected_pronunciation is not None:
-                        try:
-                            if config.get_config_object("appendAudio").value:
-                                editor.note.fields[
-                                    get_field_id(audio_field,
-                                                 editor.note)] += "[sound:%s]" % dialog.selected_pronunciation.audio
-                            else:
-                                editor.note.fields[
-                                    get_field_id(audio_field,
-                                                 editor.note)] = "[sound:%s]" % dialog.selected_pronunciation.audio
-                        except FieldNotFoundException:
-                            showWarning(
-                                "Couldn't find field '%s' for adding the audio string. Please create a field with this name or change it in the config for the note type id %s" % (
-                                    audio_field, str(note_type_id)))
-                        if not editor.addMode:
-                            editor.note.flush()
-                        editor.loadNote()
-
-                dialog.finished.connect(handle_close)
-                dialog.show()
+            """The scrape + parse runs in the background so the editor stays
+            responsive for the duration of the request; taskman dispatches
+            on_fetched back on the GUI thread"""
+            editor.mw.taskman.run_in_background(fetch, on_fetched)
 
         config_lang = config.get_deck_specific_config_object("language", deck_id)
 
@@ -172,34 +275,70 @@ def on_editor_btn_click(editor: Editor, choose_automatically: Union[None, bool]
                     proceed(d.selected_lang)
                 else:
                     showInfo("Cancelled download because no language was selected.")
+                    _inflight.discard(key)
 
             d.finished.connect(handle_lang_select)
             d.show()
+    else:
+        _inflight.discard(key)
+
+
+"""Building the context menu and acting on the click both dedup the same
+selection; the tiny LRU below makes the common menu-then-click flow pay for
+the query and the dedup only once"""
+_DEDUP_CACHE_MAX = 8
+_dedup_cache: "OrderedDict[frozenset, Tuple[List[int], int]]" = OrderedDict()
+
+
+def _dedup_selection(browser: Browser, selected) -> Tuple[List[int], int]:
+    """Returns (card ids - one per note, unique note count) for a browser selection.
+    The (id, nid) pairs come from a single query instead of one getCard round-trip
+    per selected card."""
+    key = frozenset(selected)
+    hit = _dedup_cache.get(key)
+    if hit is not None:
+        _dedup_cache.move_to_end(key)
+        return hit
+    rows = browser.mw.col.db.all(
+        "select id, nid from cards where id in " + ids2str(selected))
+    """setdefault keeps the first card seen per note and preserves row order -
+    one C-implemented dict probe per card instead of a set check plus two appends"""
+    first_cid_by_nid = {}
+    for cid, nid in rows:
+        first_cid_by_nid.setdefault(nid, cid)
+    result = (list(first_cid_by_nid.values()), len(first_cid_by_nid))
+    _dedup_cache[key] = result
+    while len(_dedup_cache) > _DEDUP_CACHE_MAX:
+        _dedup_cache.popitem(last=False)
+    return result
 
 
 def on_browser_ctx_menu_click(browser: Browser, selected):
-    cards = [browser.mw.col.getCard(card) for card in selected]
-    unique_cards = []
-    addressed_unique_cards = []
-    for card in cards:
-        if card.nid in addressed_unique_cards:
-            continue
-        unique_cards.append(card)
-        addressed_unique_cards.append(card.nid)
+    """Card objects are only constructed for the one surviving card per note"""
+    unique_cids, _ = _dedup_selection(browser, selected)
+    unique_cards = [browser.mw.col.getCard(cid) for cid in unique_cids]
 
     dialog = BulkAdd(browser.window(), unique_cards, browser.mw, config)
     dialog.show()
 
 
+_icon_path = os.path.join(asset_dir, "icon.png")
+_button_html = None  # built on the first editor; identical for every editor after that
+
+
 def add_editor_button(buttons: List[str], editor: Editor):
+    global _button_html
     editor._links["forvo_dl"] = on_editor_btn_click
-    if os.path.isabs(os.path.join(asset_dir, "icon.png")):
-        iconstr = editor.resourceToData(os.path.join(asset_dir, "icon.png"))
-    else:
-        iconstr = "/_anki/imgs/{}.png".format(os.path.join(asset_dir, "icon.png"))
+    if _button_html is None:
+        """resourceToData re-reads and base64-encodes the png from disk, so only
+        do it once instead of on every editor instance"""
+        if os.path.isabs(_icon_path):
+            iconstr = editor.resourceToData(_icon_path)
+        else:
+            iconstr = "/_anki/imgs/{}.png".format(_icon_path)
+        _button_html = "<div title=\"Hold down shift + click to select top audio\n\nCTRL+F to open window\nCTRL+SHIFT+F to select top audio\" style=\"float: right; margin: 0 3px\"><div style=\"display: flex; width: 50px; height: 25px; justify-content: center; align-items: center; padding: 0 5px; border-radius: 5px; background-color: #0094FF; color: #ffffff; font-size: 10px\" onclick=\"pycmd('forvo_dl');return false;\"><img style=\"margin-right: 5px; margin-left: 5px; height: 20px; width: 20px\" src=\"%s\"/><b style=\"user-select: none; margin-right: 7px\">Forvo</b></div></div>" % iconstr
 
-    return buttons + [
-        "<div title=\"Hold down shift + click to select top audio\n\nCTRL+F to open window\nCTRL+SHIFT+F to select top audio\" style=\"float: right; margin: 0 3px\"><div style=\"display: flex; width: 50px; height: 25px; justify-content: center; align-items: center; padding: 0 5px; border-radius: 5px; background-color: #0094FF; color: #ffffff; font-size: 10px\" onclick=\"pycmd('forvo_dl');return false;\"><img style=\"margin-right: 5px; margin-left: 5px; height: 20px; width: 20px\" src=\"%s\"/><b style=\"user-select: none; margin-right: 7px\">Forvo</b></div></div>" % iconstr]
+    return buttons + [_button_html]
 
 
 def add_editor_shortcut(shortcuts: List[Tuple], editor: Editor):
@@ -207,26 +346,44 @@ def add_editor_shortcut(shortcuts: List[Tuple], editor: Editor):
     shortcuts.append(("Ctrl+Shift+F", lambda: on_editor_btn_click(editor, True)))
 
 
+_forvo_icon = None
+
+
+def _get_forvo_icon() -> QIcon:
+    """QIcon construction decodes the png; keep one instance around instead of
+    re-decoding it on every right-click in the browser"""
+    global _forvo_icon
+    if _forvo_icon is None:
+        _forvo_icon = QIcon(_icon_path)
+    return _forvo_icon
+
+
 def add_browser_context_menu_entry(browser: Browser, m: QMenu):
     selected = browser.selectedCards()
 
-    cards = [browser.mw.col.getCard(card) for card in selected]
-    unique_cards = []
-    addressed_unique_cards = []
-    for card in cards:
-        if card.nid in addressed_unique_cards:
-            continue
-        unique_cards.append(card)
-        addressed_unique_cards.append(card.nid)
+    """The dedup result is shared with (and cached for) the click handler, so
+    rebuilding the menu and then confirming only runs the query once"""
+    _, unique_count = _dedup_selection(browser, selected)
 
     m.addSeparator()
-    action = m.addAction(QIcon(os.path.join(asset_dir, "icon.png")),
+    action = m.addAction(_get_forvo_icon(),
                          "Bulk add Forvo audio to " + str(len(selected)) + " cards (%s unique cards)" % str(
-                             len(unique_cards)) + "...")
+                             unique_count) + "...")
     action.triggered.connect(lambda: on_browser_ctx_menu_click(browser, selected))
 
 
-about = About(mw)
+"""The About dialog is built lazily on first use instead of during add-on load;
+Anki initializes add-ons serially, so every widget built here delays startup"""
+_about = None
+
+
+def get_about() -> About:
+    global _about
+    if _about is None:
+        _about = About(mw)
+    return _about
+
+
 addHook("setupEditorButtons", add_editor_button)
 gui_hooks.browser_will_show_context_menu.append(add_browser_context_menu_entry)
 gui_hooks.editor_did_init_shortcuts.append(add_editor_shortcut)